@@ -3,13 +3,34 @@
 # --- 1. Import Modules ---
 # -----------------------------------------------------
 import os
+import sys
 import subprocess
 import json
+import socket
+import tempfile
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import argparse
+import hashlib
+import re
+import shelve
+import time
+from typing import Literal
 try:
-    import google.generativeai as genai
+    from google import genai
+    from google.genai import types
+    from pydantic import BaseModel, ValidationError
 except ImportError:
-    print("Error: 'google-generativeai' library not found.")
-    print("Please install it: pip install google-generativeai")
+    print("Error: 'google-genai' library not found.")
+    print("Please install it: pip install \"google-genai[aiohttp]\"")
+    raise
+try:
+    import orjson
+except ImportError:
+    print("Error: 'orjson' library not found.")
+    print("Please install it: pip install orjson")
     raise
 
 # -----------------------------------------------------
@@ -50,9 +71,11 @@ def load_dotenv(dotenv_path):
 # --- 2. Setup LLM Client & System Prompt ---
 # -----------------------------------------------------
 
-# (This function is unchanged)
-def create_system_prompt():
-    return """
+# The prompt is a frozen module-level constant: Gemini's implicit prefix
+# cache only hits if the leading tokens are identical on every request, so
+# keep it free of f-strings, timestamps or anything else that varies. The
+# user's request is always sent after it as a separate turn.
+SYSTEM_PROMPT_V1 = """
 You are an expert Abaqus Finite Element Analyst. Your SOLE purpose is to convert a user's natural language request into a precise JSON configuration file for a simulation.
 
 You MUST follow these rules:
@@ -63,6 +86,7 @@ You MUST follow these rules:
     * Default load: 1000.0 N
     * Default mesh: 10 elements along the longest dimension, 4 in others.
     * Default geometry: If only length is given, assume a 10:1 aspect ratio (e.g., L=1.0 -> W=0.1, H=0.1).
+4.  **BATCH MODE:** If the user's message is a JSON array of objects like [{"id": 1, "request": "..."}, ...], handle each "request" independently and output a JSON array of objects like [{"id": 1, "config": {...}}, ...], with exactly one entry per input "id".
 
 ---
 ## JSON SCHEMA
@@ -90,10 +114,18 @@ You MUST follow these rules:
   }
 }
 ---
-## EXAMPLE
-User: "Sim a 1m long steel beam, 10cm high and wide, with a 1kN load at the tip. Use a 20x4x4 mesh."
-Assistant:
-{
+Now, process the user's request.
+"""
+
+def create_system_prompt():
+    return SYSTEM_PROMPT_V1
+
+# The few-shot example is sent as a synthetic user/model exchange at the
+# start of 'contents' instead of inside the system instruction. It still
+# sits in the shared prefix (so implicit caching covers it), but it can be
+# swapped without invalidating the cached system instruction.
+FEW_SHOT_USER = "Sim a 1m long steel beam, 10cm high and wide, with a 1kN load at the tip. Use a 20x4x4 mesh."
+FEW_SHOT_MODEL = """{
   "MODEL_NAME": "Cantilever_1m_1kN_20x4x4",
   "TEST_TYPE": "CantileverBeam",
   "GEOMETRY": {
@@ -114,12 +146,167 @@ Assistant:
     "elements_width": 4,
     "elements_height": 4
   }
+}"""
+
+FEW_SHOT = [
+    {"role": "user", "parts": [{"text": FEW_SHOT_USER}]},
+    {"role": "model", "parts": [{"text": FEW_SHOT_MODEL}]},
+]
+
+def build_contents(user_message):
+    """
+    Prepends the few-shot exchange to the user's message.
+    """
+    return FEW_SHOT + [{"role": "user", "parts": [{"text": user_message}]}]
+
+GEMINI_MODEL_NAME = "gemini-2.5-flash"
+EMBEDDING_MODEL_NAME = "gemini-embedding-001"
+EMBEDDING_DIMENSIONS = 768
+
+# Pydantic mirror of the JSON SCHEMA above. It is passed to Gemini as the
+# response_schema, so decoding is constrained to valid configs.
+class Geometry(BaseModel):
+    length_m: float
+    width_m: float
+    height_m: float
+
+class Material(BaseModel):
+    name: str
+    youngs_modulus_pa: float
+    poisson_ratio: float
+
+class Loading(BaseModel):
+    tip_load_n: float
+
+class Discretization(BaseModel):
+    elements_length: int
+    elements_width: int
+    elements_height: int
+
+class SimConfig(BaseModel):
+    MODEL_NAME: str
+    TEST_TYPE: Literal['CantileverBeam', 'TaylorImpact']
+    GEOMETRY: Geometry
+    MATERIAL: Material
+    LOADING: Loading
+    DISCRETIZATION: Discretization
+
+class BatchItem(BaseModel):
+    id: int
+    config: SimConfig
+
+# Deterministic decoding (temperature 0.0) is what makes it safe
+# to cache responses; see ResponseCache.
+GENERATION_CONFIG = {
+    "temperature": 0.0,
+    "top_p": 1,
+    "top_k": 1,
+    "max_output_tokens": 2048,
+    "response_mime_type": "application/json",
+    "response_schema": SimConfig,
 }
----
-Now, process the user's request.
-"""
 
-# (This function is unchanged - it reads from os.environ)
+# Fingerprint of everything besides the request that shapes Gemini's answer.
+# It is part of every response cache key, so editing the prompt, the few-shot
+# example or the schema automatically stops stale cached configs from being served.
+PROMPT_HASH = hashlib.sha256(
+    (SYSTEM_PROMPT_V1 + json.dumps(FEW_SHOT, sort_keys=True)
+     + json.dumps(SimConfig.model_json_schema(), sort_keys=True)).encode('utf-8')
+).hexdigest()[:12]
+
+class GeminiModel:
+    """
+    Bundles the genai client with the request config so callers
+    can simply 'await model.generate_content(user_message)'; the
+    few-shot exchange is prepended to every message.
+    Requests go through the async client (aiohttp when installed),
+    so several can be in flight at once.
+    """
+
+    def __init__(self, client, config):
+        self.client = client
+        self.config = config
+
+    async def generate_content(self, user_message, config=None):
+        return await self.client.aio.models.generate_content(
+            model=GEMINI_MODEL_NAME,
+            contents=build_contents(user_message),
+            config=config or self.config
+        )
+
+    async def embed(self, text):
+        result = await self.client.aio.models.embed_content(
+            model=EMBEDDING_MODEL_NAME,
+            contents=text,
+            config=types.EmbedContentConfig(output_dimensionality=EMBEDDING_DIMENSIONS)
+        )
+        return result.embeddings[0].values
+
+    async def generate_content_stream(self, user_message, config=None):
+        return await self.client.aio.models.generate_content_stream(
+            model=GEMINI_MODEL_NAME,
+            contents=build_contents(user_message),
+            config=config or self.config
+        )
+
+# Session totals of Gemini token usage, used to spot a broken prompt cache
+# (e.g. prompt drift dropping the hit rate to 0%). A "hit" is a call where
+# any prompt tokens were served from cache.
+_CACHE_STATS = {"calls": 0, "hits": 0, "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+
+# Optional JSONL file that receives one usage record per call (--usage-log)
+_usage_log_path = None
+
+def log_prompt_cache_usage(response):
+    """
+    Prints how many prompt tokens were served from Gemini's
+    cache for this response, adds the usage to _CACHE_STATS
+    and returns the cached token count.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return 0
+    prompt_tokens = usage.prompt_token_count or 0
+    cached_tokens = usage.cached_content_token_count or 0
+    output_tokens = usage.candidates_token_count or 0
+    print(f"Prompt tokens: {prompt_tokens} (cached: {cached_tokens}), output tokens: {output_tokens}")
+
+    _CACHE_STATS["calls"] += 1
+    _CACHE_STATS["hits"] += 1 if cached_tokens else 0
+    _CACHE_STATS["prompt_tokens"] += prompt_tokens
+    _CACHE_STATS["cached_tokens"] += cached_tokens
+    _CACHE_STATS["output_tokens"] += output_tokens
+
+    if _usage_log_path:
+        record = {
+            "time": time.time(),
+            "model": GEMINI_MODEL_NAME,
+            "prompt_hash": PROMPT_HASH,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "output_tokens": output_tokens,
+        }
+        try:
+            with open(_usage_log_path, 'ab') as f:
+                f.write(orjson.dumps(record) + b"\n")
+        except IOError as e:
+            print(f"Warning: Could not write usage log: {e}")
+    return cached_tokens
+
+def print_cache_stats():
+    """
+    Prints the session's prompt cache effectiveness.
+    """
+    stats = _CACHE_STATS
+    if not stats["calls"]:
+        return
+    hit_rate = stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+    print("\n--- GEMINI CACHE SUMMARY ---")
+    print(f"Calls: {stats['calls']} ({stats['hits']} with cached prompt tokens)")
+    print(f"Prompt tokens: {stats['prompt_tokens']} (cached: {stats['cached_tokens']}, {hit_rate:.0%})")
+    print(f"Output tokens: {stats['output_tokens']}")
+    print("----------------------------")
+
 def get_gemini_model(system_prompt):
     """
     Initializes the Gemini client.
@@ -131,23 +318,11 @@ def get_gemini_model(system_prompt):
         api_key = os.environ.get("GOOGLE_API_KEY") # <-- This line now works
         if not api_key:
             raise EnvironmentError("GOOGLE_API_KEY environment variable not set in .env file.")
-        genai.configure(api_key=api_key)
+        client = genai.Client(api_key=api_key)
         
-        # Set up the model generation config
-        generation_config = {
-            "temperature": 0.0,
-            "top_p": 1,
-            "top_k": 1,
-            "max_output_tokens": 2048,
-        }
-
         # Create the model with the system prompt
-        model = genai.GenerativeModel(
-            model_name="gemini-2.5-flash",
-            generation_config=generation_config,
-            system_instruction=system_prompt
-        )
-        return model
+        config = types.GenerateContentConfig(**GENERATION_CONFIG, system_instruction=system_prompt)
+        return GeminiModel(client, config)
     except Exception as e:
         print(f"Error: Could not initialize Gemini model.")
         print(f"Details: {e}")
@@ -157,54 +332,577 @@ def get_gemini_model(system_prompt):
 # --- 3. Agent Core Functions ---
 # -----------------------------------------------------
 
-# (This function is unchanged)
-def get_simulation_config_from_gemini(model, user_request):
+RESPONSE_CACHE_MAX_SIZE = 1000
+# When full, evict down to this fraction of max_size in one pass
+RESPONSE_CACHE_LOW_WATER = 0.9
+RESPONSE_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+class ResponseCache:
+    """
+    On-disk LRU/TTL cache of validated Gemini responses,
+    keyed by the model, PROMPT_HASH, an optional seed and the
+    normalized user request. Backed by 'shelve' so it survives
+    restarts of the agent.
+    """
+
+    def __init__(self, path, seed="", max_size=RESPONSE_CACHE_MAX_SIZE,
+                 ttl_seconds=RESPONSE_CACHE_TTL_SECONDS):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.seed = seed
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._db = shelve.open(path)
+        # In-memory access-time index, so eviction never has to unpickle
+        # every entry; built once per session.
+        self._accessed = {key: self._db[key]['accessed'] for key in self._db}
+
+    def make_key(self, user_request):
+        normalized = re.sub(r'\s+', ' ', user_request.strip().lower())
+        request_hash = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return f"{GEMINI_MODEL_NAME}:{PROMPT_HASH}:{self.seed}:{request_hash}"
+
+    def get(self, key):
+        entry = self._db.get(key)
+        if entry is None:
+            return None
+        now = time.time()
+        if now - entry['created'] > self.ttl_seconds:
+            del self._db[key]
+            self._accessed.pop(key, None)
+            return None
+        entry['accessed'] = now
+        self._db[key] = entry
+        self._accessed[key] = now
+        return entry['value']
+
+    def set(self, key, value):
+        now = time.time()
+        self._db[key] = {'value': value, 'created': now, 'accessed': now}
+        self._accessed[key] = now
+        if len(self._accessed) > self.max_size:
+            # Evict the least recently used entries down to the low-water mark
+            keep = int(self.max_size * RESPONSE_CACHE_LOW_WATER)
+            by_age = sorted(self._accessed, key=self._accessed.get)
+            for oldest in by_age[:len(by_age) - keep]:
+                del self._db[oldest]
+                del self._accessed[oldest]
+
+    def close(self):
+        self._db.close()
+
+SEMANTIC_CACHE_THRESHOLD = 0.95
+SEMANTIC_CACHE_MAX_SIZE = 1000
+
+# Units the semantic cache guard understands, as (dimension, SI factor).
+# Symbols are case-sensitive ('mN' is not 'MN'); spelled-out names are
+# matched case-insensitively, with or without a plural 's'.
+UNIT_SYMBOLS = {
+    "mm": ("length", 1e-3), "cm": ("length", 1e-2), "m": ("length", 1.0),
+    "mN": ("force", 1e-3), "N": ("force", 1.0), "kN": ("force", 1e3), "MN": ("force", 1e6),
+    "Pa": ("pressure", 1.0), "kPa": ("pressure", 1e3), "MPa": ("pressure", 1e6),
+    "GPa": ("pressure", 1e9),
+}
+UNIT_NAMES = {
+    "millimeter": "mm", "millimetre": "mm", "centimeter": "cm", "centimetre": "cm",
+    "meter": "m", "metre": "m",
+    "millinewton": "mN", "newton": "N", "kilonewton": "kN", "meganewton": "MN",
+    "pascal": "Pa", "kilopascal": "kPa", "megapascal": "MPa", "gigapascal": "GPa",
+}
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache for rephrased requests, consulted after
+    the exact ResponseCache misses. Stores one normalized embedding
+    per request in a float32 matrix and accepts the closest entry if
+    its cosine similarity is at least SEMANTIC_CACHE_THRESHOLD and it
+    mentions exactly the same quantities once converted to SI (so
+    '1 kN' matches '1000 newtons' but never '2 kN' or '1 MN'). Hits are not copied into the exact
+    cache, so a wrong match never outlives the semantic entry.
+    Persisted next to the response cache and discarded whenever the
+    model, PROMPT_HASH or cache seed changes.
+    """
+
+    def __init__(self, path, seed="", threshold=SEMANTIC_CACHE_THRESHOLD,
+                 max_size=SEMANTIC_CACHE_MAX_SIZE):
+        try:
+            import numpy as np
+        except ImportError:
+            print("Error: 'numpy' library not found (needed for --semantic-cache).")
+            print("Please install it: pip install numpy")
+            raise
+        self.np = np
+        self.path = path
+        self.threshold = threshold
+        self.max_size = max_size
+        self.namespace = (f"{GEMINI_MODEL_NAME}:{PROMPT_HASH}:{seed}:"
+                          f"{EMBEDDING_MODEL_NAME}:{EMBEDDING_DIMENSIONS}")
+        self.embeddings = np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+        self.requests = []
+        self.responses = []
+        self.hits = []
+        self._load()
+
+    @staticmethod
+    def _quantities(text):
+        quantities = []
+        for number, word in re.findall(r'(\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\s*([a-zA-Z]*)', text):
+            symbol = word if word in UNIT_SYMBOLS else UNIT_NAMES.get(word.lower().removesuffix('s'))
+            # Words that are not known units leave the number unitless
+            dimension, factor = UNIT_SYMBOLS.get(symbol, ("", 1.0))
+            quantities.append((dimension, float(f"{float(number) * factor:.6g}")))
+        return sorted(quantities)
+
+    def _normalize(self, embedding):
+        vector = self.np.asarray(embedding, dtype=self.np.float32)
+        return vector / (self.np.linalg.norm(vector) or 1.0)
+
+    def lookup(self, embedding, user_request):
+        if not self.requests:
+            return None
+        similarities = self.embeddings @ self._normalize(embedding)
+        best = int(self.np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        if self._quantities(self.requests[best]) != self._quantities(user_request):
+            return None
+        self.hits[best] += 1
+        return self.responses[best]
+
+    def add(self, embedding, user_request, json_string):
+        if len(self.requests) >= self.max_size:
+            # Evict the least frequently used entry
+            victim = int(self.np.argmin(self.hits))
+            self.embeddings = self.np.delete(self.embeddings, victim, axis=0)
+            del self.requests[victim], self.responses[victim], self.hits[victim]
+        self.embeddings = self.np.vstack([self.embeddings, self._normalize(embedding)])
+        self.requests.append(user_request)
+        self.responses.append(json_string)
+        self.hits.append(0)
+
+    def _load(self):
+        try:
+            with open(self.path + ".json", 'rb') as f:
+                data = orjson.loads(f.read())
+            if data["namespace"] != self.namespace:
+                return  # Prompt, model or seed changed: start fresh
+            embeddings = self.np.load(self.path + ".npy")
+        except (IOError, ValueError, KeyError):
+            return
+        # A half-written store would misalign embeddings and responses
+        rows = len(data["requests"])
+        if (embeddings.shape != (rows, EMBEDDING_DIMENSIONS)
+                or len(data["responses"]) != rows or len(data["hits"]) != rows):
+            return
+        self.embeddings = embeddings.astype(self.np.float32)
+        self.requests = data["requests"]
+        self.responses = data["responses"]
+        self.hits = data["hits"]
+
+    def close(self):
+        data = {
+            "namespace": self.namespace,
+            "requests": self.requests,
+            "responses": self.responses,
+            "hits": self.hits,
+        }
+        with open(self.path + ".json", 'wb') as f:
+            f.write(orjson.dumps(data))
+        self.np.save(self.path + ".npy", self.embeddings)
+
+def repair_truncated_json(text):
+    """
+    Best-effort recovery for output cut off by the token limit.
+    Drops anything after the top-level value closes, then closes
+    any string, objects and arrays that are still open.
+    """
+    if not text:
+        return ""
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    start = min(starts) if starts else 0
+    closers = []
+    in_string = escaped = False
+    for pos in range(start, len(text)):
+        ch = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            closers.append('}' if ch == '{' else ']')
+        elif ch in '}]' and closers:
+            closers.pop()
+            if not closers:
+                return text[start:pos + 1]
+    repaired = text[start:]
+    if in_string:
+        repaired += '"'
+    return repaired.rstrip().rstrip(',') + ''.join(reversed(closers))
+
+def describe_empty_response(response):
+    """
+    Explains why a response carried no text (e.g. a safety block,
+    or MAX_TOKENS spent entirely on thinking).
+    """
+    candidates = getattr(response, "candidates", None)
+    if candidates and candidates[0].finish_reason:
+        return f"finish reason: {candidates[0].finish_reason}"
+    feedback = getattr(response, "prompt_feedback", None)
+    if feedback and feedback.block_reason:
+        return f"prompt blocked: {feedback.block_reason}"
+    return "no reason given"
+
+def parse_simulation_config(text):
+    """
+    Validates Gemini's output against SimConfig, retrying once on
+    a repaired copy if the output was truncated.
+    """
+    try:
+        return SimConfig.model_validate_json(text)
+    except ValidationError:
+        return SimConfig.model_validate_json(repair_truncated_json(text))
+
+async def get_simulation_config_from_gemini(model, user_request, cache=None, semantic_cache=None):
+    if cache:
+        key = cache.make_key(user_request)
+        cached = cache.get(key)
+        if cached:
+            print("Using cached configuration.")
+            return cached
+
+    embedding = None
+    if semantic_cache:
+        try:
+            embedding = await model.embed(user_request)
+        except Exception as e:
+            print(f"Warning: Could not embed request for the semantic cache: {e}")
+        if embedding is not None:
+            cached = semantic_cache.lookup(embedding, user_request)
+            if cached:
+                print("Using cached configuration from a similar request.")
+                return cached
+
     print("Sending request to Gemini...")
     try:
-        response = model.generate_content(user_request)
-        json_string = response.text
-        if json_string.startswith("```json"):
-            json_string = json_string[7:].strip()
-        if json_string.endswith("```"):
-            json_string = json_string[:-3].strip()
-        return json_string
+        response = await model.generate_content(user_request)
+        log_prompt_cache_usage(response)
     except Exception as e:
         print(f"Error during Gemini API call: {e}")
         return None
 
-# (This function is unchanged)
-def save_config_and_run_abaqus(json_string, config_path, runner_script_path):
+    text = response.text or ""
+    if not text:
+        print(f"Gemini returned an empty response ({describe_empty_response(response)}).")
+        return None
+
+    try:
+        json_string = parse_simulation_config(text).model_dump_json(indent=2)
+    except ValidationError as e:
+        print("Gemini returned a config that does not match the schema.")
+        print(f"Details: {e}")
+        return None
+
+    # Only validated configs reach the caches
+    if cache:
+        cache.set(key, json_string)
+    if semantic_cache and embedding is not None:
+        semantic_cache.add(embedding, user_request, json_string)
+    return json_string
+
+# Requests per Gemini call in batch mode. Larger batches amortize more
+# round-trips but produce long outputs that are slower to finish.
+BATCH_SIZE = 20
+
+class JsonArrayStreamParser:
     """
-    Step 3: Validate the JSON.
-    Step 4: Save config and Run Abaqus.
+    Incrementally parses a streamed top-level JSON array, returning
+    each element as soon as its closing brace has arrived.
     """
-    
-    # --- Step 3: Validate (Unchanged) ---
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text):
+        self._buffer += text
+        items = []
+        while True:
+            # Skip the opening bracket, separators and whitespace
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in '[, \t\r\n':
+                self._pos += 1
+            if self._pos >= len(self._buffer) or self._buffer[self._pos] == ']':
+                break
+            try:
+                item, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                break  # Element not complete yet
+            items.append(item)
+        return items
+
+def batch_request_config(model, batch):
+    """
+    Returns the request config for a BATCH MODE call of this size.
+    """
+    # Scale the output budget with the number of configs requested
+    return model.config.model_copy(update={
+        "max_output_tokens": GENERATION_CONFIG["max_output_tokens"] * len(batch),
+        "response_schema": list[BatchItem],
+    })
+
+async def send_batch_to_gemini(model, batch):
+    """
+    Sends one BATCH MODE request for a list of (id, user_request)
+    pairs and returns a dict mapping each id to its JSON string.
+    Ids that were not part of this batch are ignored.
+    """
+    payload = json.dumps([{"id": i, "request": r} for i, r in batch])
+    requested_ids = {i for i, _ in batch}
+    config = batch_request_config(model, batch)
+    print(f"Sending batch of {len(batch)} requests to Gemini...")
+    try:
+        response = await model.generate_content(payload, config=config)
+        log_prompt_cache_usage(response)
+    except Exception as e:
+        print(f"Error during Gemini batch call: {e}")
+        return {}
+
+    text = response.text or ""
+    if not text:
+        print(f"Gemini returned an empty batch response ({describe_empty_response(response)}).")
+        return {}
+
+    # The stream parser returns every complete element, so output cut off
+    # mid-item only loses that item; each one is then validated separately.
+    items = JsonArrayStreamParser().feed(text)
+    if not items:
+        print("Gemini returned unreadable batch output. Skipping this batch.")
+        return {}
+
+    configs = {}
+    for item in items:
+        try:
+            item = BatchItem.model_validate(item)
+        except ValidationError:
+            continue
+        if item.id in requested_ids:
+            configs[item.id] = item.config.model_dump_json(indent=2)
+    return configs
+
+async def get_simulation_configs_batched(model, user_requests, cache=None):
+    """
+    Converts a list of requests into configs using one Gemini call
+    per BATCH_SIZE requests, with the calls running concurrently.
+    Returns JSON strings in the same order as user_requests, with
+    None for any request that produced no config.
+    """
+    results = [None] * len(user_requests)
+    pending = []
+    for i, user_request in enumerate(user_requests):
+        cached = cache.get(cache.make_key(user_request)) if cache else None
+        if cached:
+            results[i] = cached
+        else:
+            pending.append((i, user_request))
+
+    batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+    for configs in await asyncio.gather(*[send_batch_to_gemini(model, b) for b in batches]):
+        for i, json_string in configs.items():
+            results[i] = json_string
+            if cache:
+                cache.set(cache.make_key(user_requests[i]), json_string)
+    return results
+
+async def stream_batch_from_gemini(model, batch):
+    """
+    Streaming version of send_batch_to_gemini: yields (id, json_string)
+    as each config finishes streaming. Falls back to the non-streaming
+    call if the stream fails before producing anything.
+    """
+    payload = json.dumps([{"id": i, "request": r} for i, r in batch])
+    requested_ids = {i for i, _ in batch}
+    parser = JsonArrayStreamParser()
+    # Ids already yielded; a repeated id must not start a second Abaqus job
+    yielded = set()
+    print(f"Streaming batch of {len(batch)} requests from Gemini...")
     try:
-        config_data = json.loads(json_string)
+        chunk = None
+        async for chunk in await model.generate_content_stream(payload, config=batch_request_config(model, batch)):
+            for item in parser.feed(chunk.text or ""):
+                try:
+                    item = BatchItem.model_validate(item)
+                except ValidationError:
+                    continue
+                if item.id in requested_ids and item.id not in yielded:
+                    yielded.add(item.id)
+                    yield item.id, item.config.model_dump_json(indent=2)
+        if chunk:
+            log_prompt_cache_usage(chunk)
+    except Exception as e:
+        print(f"Error during Gemini batch stream: {e}")
+        if yielded:
+            return
+        print("Retrying batch without streaming...")
+        for i, json_string in (await send_batch_to_gemini(model, batch)).items():
+            if i in requested_ids:
+                yield i, json_string
+
+async def stream_simulation_configs_batched(model, user_requests, cache=None):
+    """
+    Streaming counterpart of get_simulation_configs_batched. Yields
+    (index, json_string) pairs in completion order, so the first
+    config can be run while later ones are still being generated.
+    """
+    pending = []
+    for i, user_request in enumerate(user_requests):
+        cached = cache.get(cache.make_key(user_request)) if cache else None
+        if cached:
+            yield i, cached
+        else:
+            pending.append((i, user_request))
+
+    # Each batch streams into a shared queue; None marks a finished batch
+    queue = asyncio.Queue()
+    async def produce(batch):
+        try:
+            async for item in stream_batch_from_gemini(model, batch):
+                await queue.put(item)
+        finally:
+            await queue.put(None)
+
+    batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+    tasks = [asyncio.create_task(produce(b)) for b in batches]
+    remaining = len(tasks)
+    while remaining:
+        item = await queue.get()
+        if item is None:
+            remaining -= 1
+            continue
+        i, json_string = item
+        if cache:
+            cache.set(cache.make_key(user_requests[i]), json_string)
+        yield i, json_string
+
+async def as_async_iter(items):
+    """
+    Lets plain lists and async generators share one 'async for'.
+    """
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+def read_user_input(prompt):
+    """
+    Reads one line from stdin on a daemon thread and returns a future
+    for it. asyncio.to_thread would park the read in the default
+    executor, which asyncio.run waits for on shutdown, so Ctrl-C at
+    the prompt would hang until Enter was pressed. The line is read
+    from the unbuffered stream: a daemon thread blocked in input()
+    holds the stdin buffer lock and aborts interpreter shutdown.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(value, error):
+        if future.done():
+            return  # Cancelled by Ctrl-C while we were waiting
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def read():
+        try:
+            print(prompt, end='', flush=True)
+            line = sys.stdin.buffer.raw.readline()
+            if not line:
+                raise EOFError("EOF when reading a line")
+            encoding = sys.stdin.encoding or 'utf-8'
+            value, error = line.decode(encoding, errors='replace').rstrip('\r\n'), None
+        except (EOFError, OSError, ValueError) as e:
+            value, error = None, e
+        try:
+            loop.call_soon_threadsafe(resolve, value, error)
+        except RuntimeError:
+            pass  # The event loop has already been closed
+
+    threading.Thread(target=read, daemon=True).start()
+    return future
+
+def read_batch_file(batch_path):
+    """
+    Reads one request per line, skipping blank lines and '#' comments.
+    """
+    with open(batch_path, 'r') as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith('#')]
+
+def validate_config(json_string):
+    """
+    Parses and prints the generated config.
+    Returns the config dictionary, or None if it is not valid JSON.
+    The configs are already pretty-printed by parse_simulation_config,
+    so the validated string is shown (and later saved) as-is.
+    """
+    try:
+        config_data = orjson.loads(json_string)
         print("\n--- CONFIGURATION GENERATED ---")
-        print(json.dumps(config_data, indent=2))
+        print(json_string)
         print("-------------------------------")
+        return config_data
     except json.JSONDecodeError:
         print("\n--- LLM VALIDATION FAILED ---")
         print("The LLM did not return valid JSON. Aborting.")
         print("Raw output:", json_string)
+        return None
+
+# Must match cantilever_builder.LEARNING_EDITION_NODE_LIMIT
+LEARNING_EDITION_NODE_LIMIT = 1000
+
+def check_node_limit(config_data):
+    """
+    Rejects meshes the Abaqus Learning Edition cannot handle before
+    any Abaqus process is started. Returns True if the mesh fits.
+    """
+    disc = config_data['DISCRETIZATION']
+    total_nodes = ((disc['elements_length'] + 1) * (disc['elements_width'] + 1)
+                   * (disc['elements_height'] + 1))
+    if total_nodes <= LEARNING_EDITION_NODE_LIMIT:
+        return True
+    print(f"\n--- MESH TOO LARGE ({config_data['MODEL_NAME']}) ---")
+    print(f"Node count ({total_nodes}) exceeds the Abaqus Learning Edition limit "
+          f"({LEARNING_EDITION_NODE_LIMIT} nodes).")
+    print("Please ask again with a coarser mesh (fewer elements). Abaqus was not started.")
+    return False
+
+def save_config_and_run_abaqus(json_string, config_path, runner_script_path):
+    """
+    Step 3: Validate the JSON.
+    Step 4: Save config and Run Abaqus.
+    """
+    
+    # --- Step 3: Validate ---
+    config_data = validate_config(json_string)
+    if config_data is None or not check_node_limit(config_data):
         return
 
-    # --- Step 4 (Part 1): Save config (Unchanged) ---
+    # --- Step 4 (Part 1): Save the validated JSON string as-is ---
     try:
-        with open(config_path, 'w') as f:
-            json.dump(config_data, f, indent=2)
+        with open(config_path, 'wb') as f:
+            f.write(json_string.encode('utf-8'))
         print(f"Configuration file saved to {config_path}")
     except IOError as e:
         print(f"Error saving config file: {e}")
         return
 
     # --- Step 4 (Part 2): Run Abaqus ---
-    script_dir = os.path.dirname(runner_script_path)
-    run_env = os.environ.copy()
-    
-    # --- START OF FIX ---
     # Read the full path to the Abaqus command from the environment
     abaqus_cmd = os.environ.get("ABAQUS_CMD_PATH")
     if not abaqus_cmd:
@@ -213,38 +911,265 @@ def save_config_and_run_abaqus(json_string, config_path, runner_script_path):
         print("Please add the full path to your 'abaqus.bat' or 'abaqus.exe' file.")
         return
 
-    # Use the full, absolute path to the Abaqus command
-    command = [abaqus_cmd, "cae", "-script", os.path.basename(runner_script_path)]
-    # --- END OF FIX ---
-    
-    print(f"\nRunning Abaqus command: {' '.join(command)}")
-    print("This may take a moment. Check 'abaqus.log' for details.")
-    
+    print("\nSending configuration to the Abaqus runner...")
     try:
-        subprocess.run(
-            command, 
-            env=run_env, 
-            cwd=script_dir, 
-            check=True, 
-            capture_output=True,
-            text=True
-        )
-        print("\n--- Abaqus Run Successful ---")
-        print(f"Check 'abaqus.log' and '{config_data['MODEL_NAME']}.odb' for results.")
-        
-    except subprocess.CalledProcessError as e:
-        print("\n--- Abaqus Run FAILED ---")
-        print("Abaqus returned a non-zero exit code.")
-        print("Check 'abaqus.log' in your directory for the full error message.")
+        reply = run_on_abaqus_runner(config_data, abaqus_cmd, runner_script_path)
     except FileNotFoundError:
         print("\n--- Abaqus Run FAILED ---")
         print(f"Error: 'abaqus' command not found at the path: {abaqus_cmd}")
         print("Please check the 'ABAQUS_CMD_PATH' in your .env file.")
+        return
+    except (OSError, RuntimeError) as e:
+        print("\n--- Abaqus Run FAILED ---")
+        print(f"Error: {e}")
+        print(f"Check '{RUNNER_LOG_NAME}' in your directory for the full error message.")
+        return
+
+    if reply.get('status') == 'ok':
+        print("\n--- Abaqus Run Successful ---")
+        print(f"Check '{RUNNER_LOG_NAME}' and '{config_data['MODEL_NAME']}.cae' for results.")
+    else:
+        print("\n--- Abaqus Run FAILED ---")
+        print(f"Abaqus reported: {reply.get('message')}")
+        print(f"Check '{RUNNER_LOG_NAME}' in your directory for the full error message.")
+
+# -----------------------------------------------------
+# --- Parallel Abaqus Jobs (Batch Mode) ---
+# -----------------------------------------------------
+# Batch configs are independent, so each gets its own one-shot Abaqus/CAE
+# process in its own directory (no clashing .lck/.rpy files), with the
+# number of simultaneous processes bounded by CPU and RAM.
+ABAQUS_CPUS_PER_JOB = 1
+ABAQUS_RAM_PER_JOB_BYTES = 2 * 1024**3
+
+@functools.lru_cache(maxsize=None)
+def get_base_env():
+    """
+    Environment shared by every Abaqus process, built once (after the
+    .env file is loaded) rather than copied per run. Callers must not
+    modify it; add per-run keys with {**get_base_env(), KEY: value}.
+    Worker threads share it directly, so no pool initializer is needed.
+    """
+    base_env = os.environ.copy()
+    base_env.pop("ABAQUS_RUNNER_PORT", None)  # Only the runner is launched in server mode
+    return base_env
+
+def max_parallel_abaqus_jobs():
+    """
+    How many Abaqus jobs to run at once. 'ABAQUS_MAX_PARALLEL_JOBS'
+    overrides the estimate from the CPU count and physical RAM.
+    """
+    override = os.environ.get("ABAQUS_MAX_PARALLEL_JOBS")
+    if override:
+        try:
+            return max(1, int(override))
+        except ValueError:
+            print(f"Warning: ignoring invalid ABAQUS_MAX_PARALLEL_JOBS={override!r}.")
+    limit = (os.cpu_count() or 1) // ABAQUS_CPUS_PER_JOB
+    try:
+        ram_bytes = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        limit = min(limit, ram_bytes // ABAQUS_RAM_PER_JOB_BYTES)
+    except (AttributeError, ValueError, OSError):
+        pass  # RAM size is not available on this platform (e.g. Windows)
+    return max(1, limit)
+
+def safe_path_component(name):
+    """
+    Makes a model name safe to use as a file or folder name, since
+    Gemini may return MODEL_NAME values containing '/' or '\\'.
+    """
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', name) or "model"
+
+def run_abaqus_job(json_string, runs_dir, runner_script_path, verbose=False):
+    """
+    Runs one batch config in a fresh Abaqus/CAE process inside its
+    own job directory under runs_dir. Safe to call from worker threads.
+    Abaqus output is streamed line by line to 'abaqus.log' in the job
+    directory (and echoed to the console when verbose is set).
+    """
+    config_data = validate_config(json_string)
+    if config_data is None or not check_node_limit(config_data):
+        return
+    model_name = config_data['MODEL_NAME']
+
+    abaqus_cmd = os.environ.get("ABAQUS_CMD_PATH")
+    if not abaqus_cmd:
+        print(f"\n--- Abaqus Run FAILED ({model_name}) ---")
+        print("Error: 'ABAQUS_CMD_PATH' not set in your .env file.")
+        return
+
+    # Absolute paths throughout, since the job runs outside script_dir
+    try:
+        os.makedirs(runs_dir, exist_ok=True)
+        job_dir = tempfile.mkdtemp(prefix=f"{safe_path_component(model_name)}_", dir=runs_dir)
+        config_path = os.path.join(job_dir, "config.json")
+        with open(config_path, 'wb') as f:
+            f.write(json_string.encode('utf-8'))
+    except (OSError, ValueError) as e:
+        print(f"Error saving config file for {model_name}: {e}")
+        return
+
+    runner_script_path = os.path.abspath(runner_script_path)
+    run_env = {
+        **get_base_env(),
+        "ABAQUS_CONFIG_PATH": config_path,
+        "ABAQUS_SCRIPT_DIR": os.path.dirname(runner_script_path),
+    }
+    command = [abaqus_cmd, "cae", f"noGUI={runner_script_path}"]
+
+    log_path = os.path.join(job_dir, "abaqus.log")
+
+    print(f"\nRunning Abaqus job '{model_name}' in {job_dir}")
+    try:
+        with subprocess.Popen(
+            command,
+            env=run_env,
+            cwd=job_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace',
+            bufsize=1
+        ) as process, open(log_path, 'w', encoding='utf-8') as log_file:
+            for line in process.stdout:
+                log_file.write(line)
+                if verbose:
+                    print(f"[{model_name}] {line}", end='')
+            returncode = process.wait()
+    except FileNotFoundError:
+        print(f"\n--- Abaqus Run FAILED ({model_name}) ---")
+        print(f"Error: 'abaqus' command not found at the path: {abaqus_cmd}")
+        return
+    except (OSError, ValueError) as e:
+        print(f"\n--- Abaqus Run FAILED ({model_name}) ---")
+        print(f"Error running Abaqus: {e}")
+        return
+
+    if returncode == 0:
+        print(f"\n--- Abaqus Run Successful ({model_name}) ---")
+        print(f"Check '{log_path}' and '{os.path.join(job_dir, model_name)}.cae' for results.")
+    else:
+        print(f"\n--- Abaqus Run FAILED ({model_name}) ---")
+        print(f"Abaqus returned exit code {returncode}.")
+        print(f"Check '{log_path}' for the full error message.")
+
+# -----------------------------------------------------
+# --- Persistent Abaqus Runner ---
+# -----------------------------------------------------
+# Abaqus/CAE startup takes far longer than building the PoC model, so one
+# CAE session running simulation_runner.py in server mode is kept alive
+# and reused for every request. It is only (re)spawned when no runner
+# answers on the port.
+RUNNER_HOST = "127.0.0.1"
+DEFAULT_RUNNER_PORT = 48750
+RUNNER_STARTUP_TIMEOUT_SECONDS = 300
+RUNNER_LOG_NAME = "abaqus_runner.log"
+
+_runner_process = None
+
+def get_runner_port():
+    # Read lazily so a value from the .env file is honoured
+    return int(os.environ.get("ABAQUS_RUNNER_PORT", DEFAULT_RUNNER_PORT))
+
+def send_to_abaqus_runner(message):
+    """
+    Sends one JSON message to the runner and returns its JSON reply.
+    Raises ConnectionRefusedError if no runner is listening.
+    """
+    with socket.create_connection((RUNNER_HOST, get_runner_port())) as conn:
+        # orjson output is compact, so the message fits on one line
+        conn.sendall(orjson.dumps(message) + b"\n")
+        reply = conn.makefile('r').readline()
+    if not reply:
+        raise RuntimeError("The Abaqus runner closed the connection without replying.")
+    return orjson.loads(reply)
+
+def start_abaqus_runner(abaqus_cmd, runner_script_path):
+    """
+    Launches Abaqus/CAE with the runner in server mode and waits
+    until it accepts connections.
+    """
+    global _runner_process
+    script_dir = os.path.dirname(runner_script_path)
+    run_env = {
+        **get_base_env(),
+        "ABAQUS_RUNNER_PORT": str(get_runner_port()),
+        "ABAQUS_SCRIPT_DIR": os.path.abspath(script_dir),
+    }
+    command = [abaqus_cmd, "cae", f"noGUI={os.path.basename(runner_script_path)}"]
+
+    print(f"Starting Abaqus runner: {' '.join(command)}")
+    print(f"This may take a moment. Check '{RUNNER_LOG_NAME}' for details.")
+    with open(os.path.join(script_dir, RUNNER_LOG_NAME), 'w') as log_file:
+        _runner_process = subprocess.Popen(
+            command,
+            env=run_env,
+            cwd=script_dir,
+            stdout=log_file,
+            stderr=subprocess.STDOUT
+        )
+
+    deadline = time.monotonic() + RUNNER_STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if _runner_process.poll() is not None:
+            raise RuntimeError(f"Abaqus runner exited with code {_runner_process.returncode} during startup.")
+        try:
+            with socket.create_connection((RUNNER_HOST, get_runner_port()), timeout=1):
+                return
+        except OSError:
+            time.sleep(1)
+    # Kill it, or the next request would spawn a second CAE and leak this one
+    _runner_process.kill()
+    _runner_process.wait()
+    raise RuntimeError("Timed out waiting for the Abaqus runner to start.")
+
+def run_on_abaqus_runner(config_data, abaqus_cmd, runner_script_path):
+    """
+    Builds the model on the persistent runner, spawning it first
+    if no runner is listening yet (or the previous one crashed).
+    """
+    try:
+        return send_to_abaqus_runner(config_data)
+    except ConnectionRefusedError:
+        start_abaqus_runner(abaqus_cmd, runner_script_path)
+        return send_to_abaqus_runner(config_data)
+
+def stop_abaqus_runner():
+    """
+    Shuts down the runner if this agent started it.
+    """
+    if _runner_process is None or _runner_process.poll() is not None:
+        return
+    try:
+        send_to_abaqus_runner({"COMMAND": "shutdown"})
+        _runner_process.wait(timeout=30)
+    except (OSError, RuntimeError, subprocess.TimeoutExpired):
+        _runner_process.kill()
 
 # -----------------------------------------------------
 # --- 4. Main Execution Loop ---
 # -----------------------------------------------------
-def main():
+async def main():
+    parser = argparse.ArgumentParser(description="Abaqus NLP Agent (Gemini Edition)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always query Gemini, bypassing the local response cache.")
+    parser.add_argument("--cache-seed", default=None,
+                        help="Namespace for the response cache; change it to start from an empty cache. "
+                             "Defaults to the AGENT_CACHE_SEED environment variable.")
+    parser.add_argument("--semantic-cache", action="store_true",
+                        help="Also reuse configs from earlier requests that are worded differently "
+                             "but mean the same thing (needs numpy; adds one embedding call per miss).")
+    parser.add_argument("--usage-log", default=None,
+                        help="Append one JSON line of Gemini token usage per call to this file.")
+    parser.add_argument("--verbose", action="store_true",
+                        help="In batch mode, echo Abaqus output to the console as well as each job's log.")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="In batch mode, wait for each full Gemini response instead of streaming configs.")
+    args = parser.parse_args()
+
+    global _usage_log_path
+    _usage_log_path = args.usage_log
+
     print("Initializing Abaqus NLP Agent (Gemini Edition)...")
     
     # --- MODIFIED: Load .env file AT THE START ---
@@ -273,24 +1198,91 @@ def main():
     if not model:
         return
     print("Gemini Model connected.")
-    print("Abaqus NLP Agent is ready.")
+
+    cache = None
+    semantic_cache = None
+    # Always clean up, so Ctrl-C or an error never leaves the headless
+    # Abaqus runner behind
+    try:
+        # Responses are only reproducible (and so cacheable) at temperature 0
+        if not args.no_cache and GENERATION_CONFIG["temperature"] == 0.0:
+            cache_seed = args.cache_seed or os.environ.get("AGENT_CACHE_SEED", "")
+            cache = ResponseCache(os.path.join(script_dir, ".agent_cache", "responses"),
+                                  seed=cache_seed)
+            if args.semantic_cache:
+                semantic_cache = SemanticCache(os.path.join(script_dir, ".agent_cache", "semantic"),
+                                               seed=cache_seed)
+        print("Abaqus NLP Agent is ready.")
     
-    # --- Step 1: Take User Input ---
-    while True:
-        print("\n" + "="*50)
-        user_request = input("> What simulation would you like to run? (or 'q' to quit)\n> ")
+        # --- Step 1: Take User Input ---
+        while True:
+            print("\n" + "="*50)
+            # Read input off the event loop so background work keeps running
+            try:
+                user_request = await read_user_input(
+                    "> What simulation would you like to run? (or 'q' to quit, 'batch:<file>' for a sweep)\n> "
+                )
+            except EOFError:
+                break
         
-        if user_request.lower() in ('q', 'quit', 'exit'):
-            break
+            if user_request.lower() in ('q', 'quit', 'exit'):
+                break
+
+            # --- Batch Mode: one request per line of a file ---
+            if user_request.startswith('batch:'):
+                batch_path = user_request[len('batch:'):].strip()
+                try:
+                    user_requests = read_batch_file(batch_path)
+                except IOError as e:
+                    print(f"Error reading batch file: {e}")
+                    continue
+                if args.no_stream:
+                    json_strings = await get_simulation_configs_batched(model, user_requests, cache)
+                    results = [(i, j) for i, j in enumerate(json_strings) if j]
+                else:
+                    # Abaqus runs on each config while the rest keep streaming in
+                    results = stream_simulation_configs_batched(model, user_requests, cache)
+                # Jobs are submitted as configs arrive and run side by side
+                loop = asyncio.get_running_loop()
+                runs_dir = os.path.join(script_dir, "runs")
+                done = set()
+                jobs = []
+                with ThreadPoolExecutor(max_workers=max_parallel_abaqus_jobs()) as pool:
+                    async for i, json_string in as_async_iter(results):
+                        done.add(i)
+                        print(f"\n> {user_requests[i]}")
+                        jobs.append(loop.run_in_executor(
+                            pool, run_abaqus_job, json_string, runs_dir, runner_script_path, args.verbose
+                        ))
+                    for outcome in await asyncio.gather(*jobs, return_exceptions=True):
+                        if isinstance(outcome, Exception):
+                            print("\n--- Abaqus Run FAILED ---")
+                            print(f"Unexpected error in batch job: {outcome}")
+                for i, user_request in enumerate(user_requests):
+                    if i not in done:
+                        print(f"\nNo configuration was generated for: {user_request}")
+                continue
             
-        # --- Step 2: Produce Config File ---
-        json_string = get_simulation_config_from_gemini(model, user_request)
+            # --- Step 2: Produce Config File ---
+            json_string = await get_simulation_config_from_gemini(model, user_request, cache, semantic_cache)
         
-        if json_string:
-            # --- Step 3 & 4: Validate and Run ---
-            save_config_and_run_abaqus(json_string, config_path, runner_script_path)
-
+            if json_string:
+                # --- Step 3 & 4: Validate and Run ---
+                await asyncio.to_thread(
+                    save_config_and_run_abaqus, json_string, config_path, runner_script_path
+                )
+    finally:
+        # Stop the runner first, so a failing cache write can't leave
+        # it behind
+        stop_abaqus_runner()
+        for local_cache in (cache, semantic_cache):
+            if local_cache:
+                try:
+                    local_cache.close()
+                except Exception as e:
+                    print(f"Warning: Could not save {type(local_cache).__name__}: {e}")
+        print_cache_stats()
     print("Agent shutting down. Goodbye.")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
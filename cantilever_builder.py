@@ -0,0 +1,143 @@
+# cantilever_builder.py - Tier 3 Cantilever Beam Model Builder
+# Shared by simulation_runner.py and any standalone cantilever script,
+# so the Abaqus model-building code exists in exactly one place.
+
+# -----------------------------------------------------
+# --- 1. Import Modules ---
+# -----------------------------------------------------
+from abaqus import *
+from abaqusConstants import *
+
+# Abaqus Learning Edition refuses to mesh models above this many nodes
+LEARNING_EDITION_NODE_LIMIT = 1000
+
+# -----------------------------------------------------
+# --- 2. Model Builder ---
+# -----------------------------------------------------
+
+def build_cantilever(model_name, geom, material, load, disc):
+    """
+    Builds and meshes a cantilever beam model in the current mdb.
+    Takes the GEOMETRY, MATERIAL, LOADING and DISCRETIZATION
+    sections of a config as dictionaries.
+    """
+    
+    # --- 2.1. Unpack Parameters ---
+    MODEL_NAME = model_name
+    
+    # Geometry
+    PART_LENGTH = geom['length_m']
+    PART_WIDTH = geom['width_m']
+    PART_HEIGHT = geom['height_m']
+    
+    # Material
+    MAT_NAME = material['name']
+    YOUNGS_MODULUS = material['youngs_modulus_pa']
+    POISSON_RATIO = material['poisson_ratio']
+    
+    # Loading
+    TIP_LOAD = load['tip_load_n']
+    
+    # Discretization
+    N_ELEMENTS_LENGTH = disc['elements_length']
+    N_ELEMENTS_WIDTH = disc['elements_width']
+    N_ELEMENTS_HEIGHT = disc['elements_height']
+
+    # --- 2.2. Node Limit Calculator ---
+    total_nodes = (N_ELEMENTS_LENGTH + 1) * (N_ELEMENTS_WIDTH + 1) * (N_ELEMENTS_HEIGHT + 1)
+    total_elements = N_ELEMENTS_LENGTH * N_ELEMENTS_WIDTH * N_ELEMENTS_HEIGHT
+
+    print(f"--- MESH PRE-CHECK ---")
+    print(f"Elements: {N_ELEMENTS_LENGTH} (L) x {N_ELEMENTS_WIDTH} (W) x {N_ELEMENTS_HEIGHT} (H) = {total_elements} elements")
+    print(f"Nodes: {total_nodes} nodes")
+
+    # Stop before any model setup: 'generateMesh' would fail anyway
+    if total_nodes > LEARNING_EDITION_NODE_LIMIT:
+        print(f"------------------------")
+        raise ValueError(
+            f"Node count {total_nodes} exceeds the Abaqus Learning Edition "
+            f"limit ({LEARNING_EDITION_NODE_LIMIT} nodes). Reduce the mesh density."
+        )
+    print(f"Node count ({total_nodes}) is within the {LEARNING_EDITION_NODE_LIMIT}-node limit.")
+    print(f"------------------------")
+
+    # -----------------------------------------------------
+    # --- 3. Create Model & Part ---
+    # -----------------------------------------------------
+    model = mdb.Model(name=MODEL_NAME)
+    sketch = model.ConstrainedSketch(name='beamProfile', sheetSize=1.0)
+    sketch.rectangle(point1=(-PART_WIDTH/2, -PART_HEIGHT/2), point2=(PART_WIDTH/2, PART_HEIGHT/2))
+    part = model.Part(name='Beam', dimensionality=THREE_D, type=DEFORMABLE_BODY)
+    part.BaseSolidExtrude(sketch=sketch, depth=PART_LENGTH)
+
+    # -----------------------------------------------------
+    # --- 4. Material and Section ---
+    # -----------------------------------------------------
+    abq_material = model.Material(name=MAT_NAME)
+    abq_material.Elastic(table=((YOUNGS_MODULUS, POISSON_RATIO), ))
+    section = model.HomogeneousSolidSection(name='BeamSection', material=MAT_NAME)
+    region = (part.cells,)
+    part.SectionAssignment(region=region, sectionName='BeamSection')
+
+    # -----------------------------------------------------
+    # --- 5. Assembly ---
+    # -----------------------------------------------------
+    assembly = model.rootAssembly
+    instance = assembly.Instance(name='BeamInstance', part=part, dependent=ON)
+
+    # -----------------------------------------------------
+    # --- 6. Step, Boundary Conditions (BCs), and Load ---
+    # -----------------------------------------------------
+    step = model.StaticStep(name='Step-1', previous='Initial')
+    
+    # Find geometry by coordinates
+    fixed_face_geom = instance.faces.findAt(((0.0, 0.0, 0.0),)) 
+    load_point_geom = instance.vertices.findAt(((PART_WIDTH/2, PART_HEIGHT/2, PART_LENGTH),))
+    
+    # Create Sets from geometry
+    assembly.Set(faces=fixed_face_geom, name='Set-FixedEnd')
+    fixed_region = model.rootAssembly.sets['Set-FixedEnd']
+    assembly.Set(vertices=load_point_geom, name='Set-LoadPoint')
+    load_region = model.rootAssembly.sets['Set-LoadPoint']
+    
+    # Apply BCs and Loads to the Sets
+    model.EncastreBC(name='Fixed', createStepName='Initial', region=fixed_region)
+    model.ConcentratedForce(name='TipLoad', createStepName='Step-1', 
+                            region=load_region, cf3= -TIP_LOAD)
+
+    # -----------------------------------------------------
+    # --- 7. Mesh and Job Submission ---
+    # -----------------------------------------------------
+    # 1. Assign mesh controls
+    part.setMeshControls(regions=part.cells, elemShape=HEX, technique=STRUCTURED)
+
+    # 2. Find edges and group them
+    #    One findAt per group: each argument is a ((x, y, z),) point on an
+    #    edge, and Abaqus returns all matching edges as one EdgeArray.
+    W, H, L = PART_WIDTH, PART_HEIGHT, PART_LENGTH
+    W2, H2, L2 = W/2.0, H/2.0, L/2.0
+
+    length_edges = part.edges.findAt(
+        (( W2,  H2, L2),), ((-W2,  H2, L2),), ((-W2, -H2, L2),), (( W2, -H2, L2),))
+    width_edges = part.edges.findAt(
+        (( 0,  H2, 0),), (( 0, -H2, 0),), (( 0,  H2, L),), (( 0, -H2, L),))
+    height_edges = part.edges.findAt(
+        (( W2, 0, 0),), ((-W2, 0, 0),), (( W2, 0, L),), ((-W2, 0, L),))
+
+    # 3. Apply seeds by number
+    part.seedEdgeByNumber(edges=length_edges, number=N_ELEMENTS_LENGTH, constraint=FIXED)
+    part.seedEdgeByNumber(edges=width_edges, number=N_ELEMENTS_WIDTH, constraint=FIXED)
+    part.seedEdgeByNumber(edges=height_edges, number=N_ELEMENTS_HEIGHT, constraint=FIXED)
+
+    # 4. Generate the mesh on the part
+    part.generateMesh()
+    
+    # 5. Create and submit the job
+    job = mdb.Job(name=MODEL_NAME, model=MODEL_NAME, type=ANALYSIS)
+    
+    # NOTE: To run in non-GUI mode, uncomment these lines:
+    # job.submit(consistencyChecking=OFF)
+    # job.waitForCompletion() 
+
+    print(f"Abaqus model '{MODEL_NAME}' created and meshed successfully.")
+    print(f"The runner saves it as '{MODEL_NAME}.cae'; open that in Abaqus/CAE to submit job '{MODEL_NAME}'.")